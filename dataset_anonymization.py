@@ -14,7 +14,121 @@ Autor: André Camatta
 import pandas as pd
 import numpy as np
 import os
-from typing import Tuple, Dict, List
+import json
+import shutil
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from typing import Tuple, Dict, List, Optional
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+try:
+    from isal import igzip
+except ImportError:
+    igzip = None
+
+try:
+    import numexpr as ne
+except ImportError:
+    ne = None
+
+
+# Copy-on-Write evita cópias defensivas em filtros e atribuições (padrão no pandas >= 3.0)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.options.mode.copy_on_write = True
+
+# Colunas com vazamento de informação futura (conhecidas apenas após a concessão)
+FUTURE_LEAK_COLS = ['last_pymnt_d', 'total_pymnt', 'recoveries', 'collection_recovery_fee', 
+                    'last_credit_pull_d', 'out_prncp', 'out_prncp_inv', 'total_pymnt_inv',
+                    'total_rec_prncp', 'total_rec_int', 'total_rec_late_fee', 'hardship_flag',
+                    'settlement_status', 'settlement_date', 'settlement_amount', 'debt_settlement_flag']
+
+# Identificadores diretos removidos por privacidade (LGPD)
+PRIVACY_COLS = ['member_id', 'emp_title', 'url', 'desc', 'title']
+
+# Status de empréstimo que definem o target binário (demais status são descartados)
+PAID_STATUS = ['Fully Paid', 'Does not meet the credit policy. Status:Fully Paid']
+DEFAULT_STATUS = ['Charged Off', 'Default', 'Late (31-120 days)', 'In Grace Period', 
+                  'Does not meet the credit policy. Status:Charged Off', 'Late (16-30 days)']
+
+# Esquema fixo das colunas mantidas após anonimização (tipos conforme o dicionário
+# de dados da Lending Club), dispensando a inferência de tipos na leitura do CSV.
+# float32 só para contagens, meses e scores (inteiros pequenos, exatos em float32);
+# valores monetários, saldos e percentuais permanecem float64 para não alterar os dados
+LENDING_CLUB_DTYPES: Dict[str, str] = {
+    'id': 'int64', 'loan_amnt': 'float64', 'funded_amnt': 'float64', 'funded_amnt_inv': 'float64',
+    'term': 'category', 'int_rate': 'category', 'installment': 'float64', 'grade': 'category',
+    'sub_grade': 'category', 'emp_length': 'category', 'home_ownership': 'category',
+    'annual_inc': 'float64', 'verification_status': 'category', 'issue_d': 'string',
+    'loan_status': 'category', 'pymnt_plan': 'category', 'purpose': 'category',
+    'zip_code': 'category', 'addr_state': 'category', 'dti': 'float64', 'delinq_2yrs': 'float32',
+    'earliest_cr_line': 'category', 'fico_range_low': 'float32', 'fico_range_high': 'float32',
+    'inq_last_6mths': 'float32', 'mths_since_last_delinq': 'float32',
+    'mths_since_last_record': 'float32', 'open_acc': 'float32', 'pub_rec': 'float32',
+    'revol_bal': 'float64', 'revol_util': 'category', 'total_acc': 'float32',
+    'initial_list_status': 'category', 'last_pymnt_amnt': 'float64', 'next_pymnt_d': 'category',
+    'last_fico_range_high': 'float32', 'last_fico_range_low': 'float32',
+    'collections_12_mths_ex_med': 'float32', 'mths_since_last_major_derog': 'float32',
+    'policy_code': 'float32', 'application_type': 'category', 'annual_inc_joint': 'float64',
+    'dti_joint': 'float64', 'verification_status_joint': 'category', 'acc_now_delinq': 'float32',
+    'tot_coll_amt': 'float64', 'tot_cur_bal': 'float64', 'open_acc_6m': 'float32',
+    'open_act_il': 'float32', 'open_il_12m': 'float32', 'open_il_24m': 'float32',
+    'mths_since_rcnt_il': 'float32', 'total_bal_il': 'float64', 'il_util': 'float64',
+    'open_rv_12m': 'float32', 'open_rv_24m': 'float32', 'max_bal_bc': 'float64',
+    'all_util': 'float64', 'total_rev_hi_lim': 'float64', 'inq_fi': 'float32',
+    'total_cu_tl': 'float32', 'inq_last_12m': 'float32', 'acc_open_past_24mths': 'float32',
+    'avg_cur_bal': 'float64', 'bc_open_to_buy': 'float64', 'bc_util': 'float64',
+    'chargeoff_within_12_mths': 'float32', 'delinq_amnt': 'float64',
+    'mo_sin_old_il_acct': 'float32', 'mo_sin_old_rev_tl_op': 'float32',
+    'mo_sin_rcnt_rev_tl_op': 'float32', 'mo_sin_rcnt_tl': 'float32', 'mort_acc': 'float32',
+    'mths_since_recent_bc': 'float32', 'mths_since_recent_bc_dlq': 'float32',
+    'mths_since_recent_inq': 'float32', 'mths_since_recent_revol_delinq': 'float32',
+    'num_accts_ever_120_pd': 'float32', 'num_actv_bc_tl': 'float32', 'num_actv_rev_tl': 'float32',
+    'num_bc_sats': 'float32', 'num_bc_tl': 'float32', 'num_il_tl': 'float32',
+    'num_op_rev_tl': 'float32', 'num_rev_accts': 'float32', 'num_rev_tl_bal_gt_0': 'float32',
+    'num_sats': 'float32', 'num_tl_120dpd_2m': 'float32', 'num_tl_30dpd': 'float32',
+    'num_tl_90g_dpd_24m': 'float32', 'num_tl_op_past_12m': 'float32', 'pct_tl_nvr_dlq': 'float64',
+    'percent_bc_gt_75': 'float64', 'pub_rec_bankruptcies': 'float32', 'tax_liens': 'float32',
+    'tot_hi_cred_lim': 'float64', 'total_bal_ex_mort': 'float64', 'total_bc_limit': 'float64',
+    'total_il_high_credit_limit': 'float64', 'revol_bal_joint': 'float64',
+    'sec_app_fico_range_low': 'float32', 'sec_app_fico_range_high': 'float32',
+    'sec_app_earliest_cr_line': 'category', 'sec_app_inq_last_6mths': 'float32',
+    'sec_app_mort_acc': 'float32', 'sec_app_open_acc': 'float32', 'sec_app_revol_util': 'float64',
+    'sec_app_open_act_il': 'float32', 'sec_app_num_rev_accts': 'float32',
+    'sec_app_chargeoff_within_12_mths': 'float32', 'sec_app_collections_12_mths_ex_med': 'float32',
+    'hardship_type': 'category', 'hardship_reason': 'category', 'hardship_status': 'category',
+    'deferral_term': 'float32', 'hardship_amount': 'float64', 'hardship_start_date': 'category',
+    'hardship_end_date': 'category', 'payment_plan_start_date': 'category',
+    'hardship_length': 'float32', 'hardship_dpd': 'float32', 'hardship_loan_status': 'category',
+    'orig_projected_additional_accrued_interest': 'float64',
+    'hardship_payoff_balance_amount': 'float64', 'hardship_last_payment_amount': 'float64'
+}
+
+LENDING_CLUB_KEEP_COLS: List[str] = list(LENDING_CLUB_DTYPES)
+
+# Diretório do cache Parquet do CSV bruto, particionado por ano de emissão
+PARQUET_CACHE_DIR = 'cache.parquet'
+
+# Marcador com a identificação do CSV de origem do cache (ignorado pelo pyarrow.dataset)
+CACHE_SOURCE_FILE = '_source.json'
+
+# Diretório dos checkpoints Arrow IPC entre etapas do pipeline
+CHECKPOINT_DIR = '.cache'
+
+# Colunas categóricas de baixa cardinalidade (gravadas com dictionary encoding)
+LOW_CARDINALITY_COLS = ['grade', 'sub_grade', 'home_ownership', 'purpose', 'addr_state']
 
 
 def download_kaggle_dataset(dataset_id: str, download_path: str = '.') -> str:
@@ -57,35 +171,360 @@ def download_kaggle_dataset(dataset_id: str, download_path: str = '.') -> str:
     return main_file
 
 
-def load_lending_club_data(file_path: str) -> pd.DataFrame:
+def _detect_compression(file_path: str) -> Optional[str]:
     """
-    Carrega dados do Lending Club detectando automaticamente o formato.
+    Detecta se o arquivo está comprimido com gzip.
     
     Args:
         file_path: Caminho para o arquivo de dados
         
     Returns:
-        DataFrame com os dados carregados
+        'gzip' se o arquivo for gzip, None caso contrário
     """
-    print(f"Carregando dados de: {file_path}")
-    
-    # Detectar se é comprimido ou não
     if file_path.endswith('.gz'):
-        compression = 'gzip'
-    elif file_path.endswith('.gzip'):
+        return 'gzip'
+    if file_path.endswith('.gzip'):
         # Verificar se realmente é gzip ou apenas extensão enganosa
         with open(file_path, 'rb') as f:
             magic = f.read(2)
-            compression = 'gzip' if magic == b'\x1f\x8b' else None
-    else:
-        compression = None
+        return 'gzip' if magic == b'\x1f\x8b' else None
+    return None
+
+
+def _open_data_file(file_path: str):
+    """
+    Abre o arquivo de dados para leitura binária, descomprimindo gzip se necessário.
+    
+    A descompressão gzip usa o igzip (Intel ISA-L, SIMD) quando python-isal
+    está instalado, ou o zlib do PyArrow caso contrário. Arquivos sem
+    compressão são mapeados em memória, sem cópia para um buffer próprio.
+    
+    Args:
+        file_path: Caminho para o arquivo de dados
+        
+    Returns:
+        Arquivo binário aberto (usar com 'with')
+    """
+    compression = _detect_compression(file_path)
+    if compression == 'gzip' and igzip is not None:
+        return igzip.open(file_path, 'rb')
+    if compression is None:
+        return pa.memory_map(file_path, 'r')
+    return pa.input_stream(file_path, compression=compression)
+
+
+def _read_header(file_path: str) -> List[str]:
+    """Lê apenas o cabeçalho do arquivo de dados."""
+    with _open_data_file(file_path) as source:
+        return pacsv.open_csv(source, read_options=pacsv.ReadOptions(block_size=1 << 20)).schema.names
+
+
+def _keep_columns(columns: List[str]) -> List[str]:
+    """Remove colunas de vazamento e de privacidade de uma lista de colunas."""
+    excluded = set(FUTURE_LEAK_COLS + PRIVACY_COLS)
+    return [col for col in columns if col not in excluded]
+
+
+def _downcast(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduz o uso de memória convertendo colunas para tipos menores.
+    
+    Inteiros são rebaixados para o menor tipo que os comporta, floats viram
+    float32 apenas quando a conversão é exata (sem alterar nenhum valor) e
+    colunas de texto com poucos valores distintos viram categóricas. O
+    resultado é montado de uma vez, em blocos consolidados.
+    
+    Args:
+        df: DataFrame carregado
+        
+    Returns:
+        DataFrame com tipos reduzidos
+    """
+    float_cols = set(df.select_dtypes('float').columns)
+    int_cols = set(df.select_dtypes('integer').columns)
+    text_cols = set(df.select_dtypes(include=['object', 'string']).columns) if len(df) > 0 else set()
+    
+    def convert(col: str) -> pd.Series:
+        s = df[col]
+        if col in float_cols:
+            s32 = s.astype('float32')
+            return s32 if np.array_equal(s32.astype('float64'), s, equal_nan=True) else s
+        if col in int_cols:
+            return pd.to_numeric(s, downcast='integer')
+        if col in text_cols and s.nunique() / len(df) < 0.5:
+            return s.astype('category')
+        return s
+    
+    return pd.DataFrame({col: convert(col) for col in df.columns}, index=df.index)
+
+
+def _arrow_column_types(dtypes: Dict[str, str]) -> Dict[str, pa.DataType]:
+    """Converte tipos pandas do esquema fixo para tipos PyArrow (categóricas viram dicionário)."""
+    types = {}
+    for col, dtype in dtypes.items():
+        if dtype == 'category':
+            types[col] = pa.dictionary(pa.int32(), pa.string())
+        elif dtype == 'string':
+            types[col] = pa.string()
+        else:
+            types[col] = pa.from_numpy_dtype(np.dtype(dtype))
+    return types
+
+
+def load_lending_club_data(file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Carrega dados do Lending Club detectando automaticamente o formato.
     
-    df = pd.read_csv(file_path, compression=compression, low_memory=False)
+    A leitura usa o parser multithread do PyArrow, com os tipos de
+    LENDING_CLUB_DTYPES para as colunas conhecidas e inferência para as
+    demais. Se a conversão falhar (valor incompatível com o esquema fixo ou
+    com o tipo inferido no primeiro bloco), recorre ao pandas sem esquema,
+    que infere os tipos a partir do arquivo inteiro.
+    
+    Args:
+        file_path: Caminho para o arquivo de dados
+        columns: Colunas a carregar (None carrega todas; colunas ausentes no
+            arquivo são criadas vazias)
+        
+    Returns:
+        DataFrame com os dados carregados
+    """
+    print(f"Carregando dados de: {file_path}")
+    
+    try:
+        with _open_data_file(file_path) as source:
+            table = pacsv.read_csv(
+                source,
+                read_options=pacsv.ReadOptions(block_size=16 << 20, use_threads=True),
+                convert_options=pacsv.ConvertOptions(column_types=_arrow_column_types(LENDING_CLUB_DTYPES),
+                                                     include_columns=columns,
+                                                     include_missing_columns=True,
+                                                     strings_can_be_null=True)
+            )
+        df = table.to_pandas(self_destruct=True)
+        del table
+    except pa.ArrowInvalid as e:
+        print(f"   Leitura via PyArrow falhou ({e}); usando pandas")
+        df = _read_csv_pandas(file_path, columns)
+    
+    df = _downcast(df)
     print(f"Dados carregados: {df.shape}")
     
     return df
 
 
+def _read_csv_pandas(file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Lê o CSV com o parser do pandas, sem esquema fixo (tipos inferidos no arquivo inteiro).
+    
+    Args:
+        file_path: Caminho para o arquivo de dados
+        columns: Colunas a carregar (None carrega todas; colunas ausentes no
+            arquivo são criadas vazias)
+        
+    Returns:
+        DataFrame com os dados lidos
+    """
+    with _open_data_file(file_path) as source:
+        usecols = None
+        if columns is not None:
+            keep = set(columns)
+            usecols = lambda col: col in keep
+        df = pd.read_csv(source, usecols=usecols, engine='c', low_memory=False)
+    if columns is not None:
+        df = df.reindex(columns=columns)
+    return df
+
+
+def _source_fingerprint(csv_path: str) -> Dict[str, object]:
+    """
+    Identifica o CSV bruto pelo nome e tamanho do arquivo.
+    
+    Args:
+        csv_path: Caminho para o CSV bruto
+        
+    Returns:
+        Dicionário com nome e tamanho em bytes
+    """
+    return {'name': os.path.basename(csv_path), 'size': os.path.getsize(csv_path)}
+
+
+def _read_cache_source(cache_dir: str) -> Optional[Dict[str, object]]:
+    """
+    Lê o marcador de origem gravado junto ao cache Parquet.
+    
+    Args:
+        cache_dir: Diretório do dataset Parquet
+        
+    Returns:
+        Conteúdo do marcador ou None se ausente/ilegível
+    """
+    try:
+        with open(os.path.join(cache_dir, CACHE_SOURCE_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _materialize_parquet_cache(csv_path: str, cache_dir: str = PARQUET_CACHE_DIR) -> str:
+    """
+    Converte o CSV bruto em um dataset Parquet particionado por ano (uma única vez).
+    
+    O ano é extraído de issue_d (formato 'Dec-2018') e gravado como partição
+    hive 'year', permitindo ler apenas os anos de interesse nas execuções
+    seguintes. Se o cache já existir e tiver sido gerado a partir do mesmo
+    CSV (nome e tamanho), é reutilizado sem reler o arquivo; caso contrário,
+    é reconstruído. O marcador guarda também o cabeçalho original do CSV,
+    usado no relatório de colunas removidas.
+    
+    Args:
+        csv_path: Caminho para o CSV bruto
+        cache_dir: Diretório do dataset Parquet
+        
+    Returns:
+        Caminho do diretório do cache
+    """
+    fingerprint = _source_fingerprint(csv_path)
+    if os.path.isdir(cache_dir):
+        cached = _read_cache_source(cache_dir)
+        if cached is not None and 'columns' in cached and all(cached.get(k) == v for k, v in fingerprint.items()):
+            print(f"Usando cache Parquet: {cache_dir}")
+            return cache_dir
+        print(f"Cache Parquet desatualizado para {fingerprint['name']}; reconstruindo")
+        shutil.rmtree(cache_dir)
+    
+    print(f"Criando cache Parquet particionado por ano: {cache_dir}")
+    
+    def with_year(batch: pa.RecordBatch) -> pa.RecordBatch:
+        issue_d = pc.cast(batch.column('issue_d'), pa.string())
+        year = pc.cast(pc.utf8_slice_codeunits(issue_d, -4), pa.int16())
+        return pa.RecordBatch.from_arrays(batch.columns + [year], names=batch.schema.names + ['year'])
+    
+    partitioning = ds.partitioning(pa.schema([('year', pa.int16())]), flavor='hive')
+    tmp_dir = f"{cache_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    try:
+        with _open_data_file(csv_path) as source:
+            reader = pacsv.open_csv(
+                source,
+                read_options=pacsv.ReadOptions(block_size=16 << 20),
+                convert_options=pacsv.ConvertOptions(column_types=_arrow_column_types(LENDING_CLUB_DTYPES),
+                                                     include_columns=LENDING_CLUB_KEEP_COLS,
+                                                     include_missing_columns=True,
+                                                     strings_can_be_null=True)
+            )
+            schema = reader.schema.append(pa.field('year', pa.int16()))
+            batches = pa.RecordBatchReader.from_batches(schema, (with_year(b) for b in reader))
+            ds.write_dataset(batches, base_dir=tmp_dir, format='parquet', partitioning=partitioning)
+    except pa.ArrowInvalid as e:
+        # Valor incompatível com o esquema fixo: a releitura com o mesmo esquema
+        # falharia de novo, então vai direto ao pandas sem esquema
+        print(f"   Leitura em streaming falhou ({e}); convertendo via pandas")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        table = pa.Table.from_pandas(_downcast(_read_csv_pandas(csv_path, LENDING_CLUB_KEEP_COLS)),
+                                     preserve_index=False)
+        table = pa.Table.from_batches([with_year(b) for b in table.to_batches()])
+        ds.write_dataset(table, base_dir=tmp_dir, format='parquet', partitioning=partitioning)
+    
+    with open(os.path.join(tmp_dir, CACHE_SOURCE_FILE), 'w') as f:
+        json.dump({**fingerprint, 'columns': _read_header(csv_path)}, f)
+    os.rename(tmp_dir, cache_dir)
+    return cache_dir
+
+
+def _open_cache_dataset(cache_dir: str) -> ds.Dataset:
+    """
+    Abre o cache Parquet como dataset particionado por ano.
+    
+    Status e data de emissão são lidos como dicionário, chegando ao pandas
+    como categóricas (filtros e conversões operam sobre as categorias).
+    
+    Args:
+        cache_dir: Diretório do dataset Parquet
+        
+    Returns:
+        Dataset PyArrow
+    """
+    parquet_format = ds.ParquetFileFormat(read_options={'dictionary_columns': ['loan_status', 'issue_d']})
+    return ds.dataset(cache_dir, format=parquet_format, partitioning='hive')
+
+
+def _process_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aplica filtro temporal, filtro de status, target e remoção de colunas a um bloco de linhas.
+    
+    Args:
+        df: Bloco de linhas do dataset original
+        
+    Returns:
+        Bloco filtrado e anonimizado
+    """
+    # 1. Ano de emissão (issue_d no formato 'Dec-2018')
+    # (astype garante datetime64 também quando issue_d é categórica)
+    issue_d = pd.to_datetime(df['issue_d'], format='%b-%Y', cache=True).astype('datetime64[ns]')
+    year = issue_d.dt.year.to_numpy()
+    
+    # 2. Rótulo do target por categoria de status (-1 = descartar, 0 = pago, 1 = default);
+    # a posição extra no fim atende o código -1 (status ausente)
+    status = df['loan_status'].astype('category')
+    label = np.full(len(status.cat.categories) + 1, -1, dtype=np.int8)
+    for value, statuses in ((0, PAID_STATUS), (1, DEFAULT_STATUS)):
+        indexer = status.cat.categories.get_indexer(statuses)
+        label[indexer[indexer >= 0]] = value
+    status_label = label[status.cat.codes.to_numpy()]
+    
+    # Filtro temporal (2015-2020) e de status em uma única máscara
+    if ne is not None:
+        keep = ne.evaluate('(y >= 2015) & (y <= 2020) & (s >= 0)', local_dict={'y': year, 's': status_label})
+    else:
+        keep = (year >= 2015) & (year <= 2020) & (status_label >= 0)
+    
+    df_filtered = df.loc[keep].reset_index(drop=True).assign(issue_d=issue_d.to_numpy()[keep],
+                                                            ano=year[keep].astype(np.int16),
+                                                            target_default=status_label[keep])
+    
+    # 3. Remover colunas com vazamento de informação futura e
+    # 4. Remover/Anonimizar identificadores diretos (LGPD) em um único drop
+    return df_filtered.drop(columns=[col for col in FUTURE_LEAK_COLS + PRIVACY_COLS
+                                     if col in df_filtered.columns])
+
+
+def _cache_raw_columns(cache_dir: str) -> List[str]:
+    """Cabeçalho do CSV bruto registrado no marcador do cache (vazio se ausente)."""
+    return (_read_cache_source(cache_dir) or {}).get('columns', [])
+
+
+def _cache_raw_shape(cache_dir: str) -> Tuple[int, int]:
+    """
+    Shape do CSV bruto a partir do cache (todas as linhas, contadas pelos metadados Parquet).
+    
+    Args:
+        cache_dir: Diretório do dataset Parquet
+        
+    Returns:
+        Tupla com (linhas, colunas) do arquivo original
+    """
+    dataset = _open_cache_dataset(cache_dir)
+    columns = _cache_raw_columns(cache_dir) or [col for col in dataset.schema.names if col != 'year']
+    return dataset.count_rows(), len(columns)
+
+
+def _report_filtered(original_columns: List[str], df_filtered: pd.DataFrame) -> None:
+    """
+    Imprime o resumo da anonimização (target e colunas removidas).
+    
+    Args:
+        original_columns: Colunas do arquivo bruto, antes da projeção na leitura
+        df_filtered: DataFrame filtrado e anonimizado
+    """
+    target_dist = df_filtered['target_default'].value_counts(normalize=True)
+    print(f"   Distribuição target: {target_dist[0]:.1%} pagos, {target_dist[1]:.1%} default")
+    print(f"   Removidas {len(set(FUTURE_LEAK_COLS) & set(original_columns))} colunas de vazamento")
+    print(f"   Removidas {len(set(PRIVACY_COLS) & set(original_columns))} colunas de privacidade")
+    print(f"Anonimização concluída: {df_filtered.shape}")
+
+
 def anonymize_and_filter_data(df: pd.DataFrame) -> pd.DataFrame:
     """
     Aplica anonimização e filtragem conforme especificações do projeto.
@@ -98,107 +537,330 @@ def anonymize_and_filter_data(df: pd.DataFrame) -> pd.DataFrame:
     """
     print("Iniciando anonimização e filtragem...")
     
-    # 1. Filtrar período 2015-2020
-    df['issue_d'] = pd.to_datetime(df['issue_d'])
-    df_filtered = df[(df['issue_d'] >= '2015-01-01') & (df['issue_d'] <= '2020-12-31')].copy()
-    print(f"   Após filtro temporal (2015-2020): {df_filtered.shape}")
+    df_filtered = _process_chunk(df)
+    _report_filtered(list(df.columns), df_filtered)
     
-    # 2. Criar variável target binária
-    paid_status = ['Fully Paid', 'Does not meet the credit policy. Status:Fully Paid']
-    default_status = ['Charged Off', 'Default', 'Late (31-120 days)', 'In Grace Period', 
-                     'Does not meet the credit policy. Status:Charged Off', 'Late (16-30 days)']
+    return df_filtered
+
+
+def anonymize_and_filter_data_chunked(cache_dir: str = PARQUET_CACHE_DIR,
+                                      start_year: int = 2015, end_year: int = 2020,
+                                      batch_size: int = 500_000) -> Tuple[Tuple[int, int], pd.DataFrame]:
+    """
+    Equivalente a anonymize_and_filter_data, lendo o cache Parquet em blocos.
     
-    df_filtered = df_filtered[df_filtered['loan_status'].isin(paid_status + default_status)]
-    df_filtered['target_default'] = df_filtered['loan_status'].isin(default_status).astype(int)
+    Cada bloco lido do cache Parquet é filtrado e anonimizado antes do
+    próximo, de modo que apenas as linhas mantidas ficam em memória.
     
-    target_dist = df_filtered['target_default'].value_counts(normalize=True)
-    print(f"   Distribuição target: {target_dist[0]:.1%} pagos, {target_dist[1]:.1%} default")
+    Args:
+        cache_dir: Diretório do dataset Parquet
+        start_year: Primeiro ano de emissão incluído
+        end_year: Último ano de emissão incluído
+        batch_size: Número máximo de linhas por bloco
+        
+    Returns:
+        Tupla com (shape do CSV bruto, DataFrame filtrado e anonimizado)
+    """
+    print(f"Carregando e filtrando em blocos: {cache_dir} ({start_year}-{end_year})")
     
-    # 3. Remover colunas com vazamento de informação futura
-    future_leak_cols = ['last_pymnt_d', 'total_pymnt', 'recoveries', 'collection_recovery_fee', 
-                       'last_credit_pull_d', 'out_prncp', 'out_prncp_inv', 'total_pymnt_inv',
-                       'total_rec_prncp', 'total_rec_int', 'total_rec_late_fee', 'hardship_flag',
-                       'settlement_status', 'settlement_date', 'settlement_amount', 'debt_settlement_flag']
+    dataset = _open_cache_dataset(cache_dir)
+    columns = _keep_columns([col for col in dataset.schema.names if col != 'year'])
+    year = ds.field('year')
     
-    existing_leak_cols = [col for col in future_leak_cols if col in df_filtered.columns]
-    df_filtered = df_filtered.drop(columns=existing_leak_cols)
-    print(f"   Removidas {len(existing_leak_cols)} colunas de vazamento")
+    n_rows = 0
+    chunks = []
+    for batch in dataset.to_batches(columns=columns, filter=(year >= start_year) & (year <= end_year),
+                                    batch_size=batch_size):
+        n_rows += batch.num_rows
+        chunks.append(_process_chunk(batch.to_pandas()))
     
-    # 4. Remover/Anonimizar identificadores diretos (LGPD)
-    privacy_cols = ['member_id', 'emp_title', 'url', 'desc', 'title']
-    existing_privacy_cols = [col for col in privacy_cols if col in df_filtered.columns]
-    df_filtered = df_filtered.drop(columns=existing_privacy_cols)
-    print(f"   Removidas {len(existing_privacy_cols)} colunas de privacidade")
+    original_shape = _cache_raw_shape(cache_dir)
+    print(f"Dados originais: {original_shape}")
+    print(f"Dados carregados: {(n_rows, len(columns))}")
     
-    print(f"Anonimização concluída: {df_filtered.shape}")
-    return df_filtered
+    # Tipos reduzidos só após a concatenação (categorias consistentes entre blocos)
+    df_filtered = _downcast(pd.concat(chunks, ignore_index=True))
+    del chunks
+    
+    _report_filtered(_cache_raw_columns(cache_dir), df_filtered)
+    
+    return original_shape, df_filtered
+
+
+def anonymize_and_filter_data_polars(cache_dir: str = PARQUET_CACHE_DIR,
+                                     start_year: int = 2015,
+                                     end_year: int = 2020) -> Tuple[Tuple[int, int], pd.DataFrame]:
+    """
+    Equivalente a anonymize_and_filter_data, lendo o cache Parquet com Polars.
+    
+    Lê o cache Parquet de forma lazy e expressa filtro temporal, filtro de
+    status, criação do target e remoção de colunas em uma única consulta,
+    executada em todos os núcleos. A conversão para pandas ocorre só no fim.
+    
+    Args:
+        cache_dir: Diretório do dataset Parquet
+        start_year: Primeiro ano de emissão incluído
+        end_year: Último ano de emissão incluído
+        
+    Returns:
+        Tupla com (shape do CSV bruto, DataFrame filtrado e anonimizado)
+        
+    Raises:
+        ImportError: Se polars não estiver instalado
+    """
+    if pl is None:
+        raise ImportError("Biblioteca 'polars' não encontrada. Instale com: uv add polars")
+    
+    print(f"Carregando e filtrando com Polars: {cache_dir} ({start_year}-{end_year})")
+    
+    lf = pl.scan_parquet(os.path.join(cache_dir, '**', '*.parquet'), hive_partitioning=True)
+    columns = _keep_columns([col for col in lf.collect_schema().names() if col != 'year'])
+    lf = lf.filter(pl.col('year').is_between(start_year, end_year)).select(columns)
+    
+    original_shape = _cache_raw_shape(cache_dir)
+    print(f"Dados originais: {original_shape}")
+    print(f"Dados carregados: {(lf.select(pl.len()).collect().item(), len(columns))}")
+    
+    # issue_d no formato 'Dec-2018' (dia fixado em 01 para o parser)
+    issue_d = pl.concat_str([pl.lit('01-'), pl.col('issue_d').cast(pl.String)]).str.strptime(pl.Datetime('ns'), '%d-%b-%Y')
+    df_filtered = (
+        lf.with_columns(issue_d=issue_d)
+        .with_columns(ano=pl.col('issue_d').dt.year().cast(pl.Int16))
+        .filter(pl.col('ano').is_between(start_year, end_year)
+                & pl.col('loan_status').is_in(PAID_STATUS + DEFAULT_STATUS))
+        .with_columns(target_default=pl.col('loan_status').is_in(DEFAULT_STATUS).cast(pl.Int8))
+        .collect(engine='streaming')
+    )
+    
+    df_filtered = _downcast(df_filtered.to_pandas())
+    
+    _report_filtered(_cache_raw_columns(cache_dir), df_filtered)
+    
+    return original_shape, df_filtered
+
+
+def _checkpoint_path(name: str, csv_path: str) -> str:
+    """
+    Caminho do checkpoint, identificado pelo nome e tamanho do CSV bruto.
+    
+    Args:
+        name: Nome da etapa
+        csv_path: Caminho para o CSV bruto
+        
+    Returns:
+        Caminho do arquivo .arrow
+    """
+    fingerprint = _source_fingerprint(csv_path)
+    return os.path.join(CHECKPOINT_DIR, f"{name}_{fingerprint['name']}_{fingerprint['size']}.arrow")
+
+
+def _checkpoint(df: pd.DataFrame, name: str, csv_path: str, original_shape: Tuple[int, int]) -> None:
+    """
+    Salva DataFrame intermediário em Arrow IPC (Feather v2, sem compressão).
+    
+    Sem compressão o arquivo pode ser lido via memory map sem cópia. A
+    gravação usa um nome temporário e troca atômica; checkpoints da mesma
+    etapa gerados a partir de outro CSV são removidos.
+    
+    Args:
+        df: DataFrame da etapa
+        name: Nome da etapa
+        csv_path: Caminho para o CSV bruto
+        original_shape: Shape do CSV bruto, guardado nos metadados
+    """
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    path = _checkpoint_path(name, csv_path)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = {**table.schema.metadata, b'original_shape': ','.join(map(str, original_shape)).encode()}
+    feather.write_feather(table.replace_schema_metadata(metadata), f"{path}.tmp", compression='uncompressed')
+    os.replace(f"{path}.tmp", path)
+    
+    for filename in os.listdir(CHECKPOINT_DIR):
+        stale = os.path.join(CHECKPOINT_DIR, filename)
+        if filename.startswith(f"{name}_") and filename.endswith('.arrow') and stale != path:
+            os.remove(stale)
+
+
+def _load_checkpoint(name: str, csv_path: str) -> Optional[Tuple[Tuple[int, int], pd.DataFrame]]:
+    """
+    Carrega checkpoint da etapa se existir para o CSV bruto atual.
+    
+    Args:
+        name: Nome da etapa
+        csv_path: Caminho para o CSV bruto
+        
+    Returns:
+        Tupla com (shape do CSV bruto, DataFrame da etapa), ou None
+    """
+    path = _checkpoint_path(name, csv_path)
+    if not os.path.exists(path):
+        return None
+    
+    print(f"Usando checkpoint: {path}")
+    table = feather.read_table(path, memory_map=True)
+    original_shape = tuple(int(n) for n in table.schema.metadata[b'original_shape'].split(b','))
+    return original_shape, table.to_pandas()
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _build_strata_kernel(year, target, base_year, n_strata):
+        strata = np.empty(len(year), dtype=np.int64)
+        counts = np.zeros(n_strata, dtype=np.int64)
+        for i in range(len(year)):
+            sid = (year[i] - base_year) * 2 + target[i]
+            strata[i] = sid
+            counts[sid] += 1
+        return strata, counts
+
+
+def _build_strata(year: np.ndarray, target: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula o estrato de cada linha ((ano - ano_inicial) * 2 + target) e a contagem por estrato.
+    
+    Usa um kernel Numba (uma única passagem) quando disponível, ou NumPy caso contrário.
+    
+    Args:
+        year: Ano de emissão de cada linha
+        target: Target binário de cada linha
+        
+    Returns:
+        Tupla com (estrato de cada linha, contagem por estrato)
+    """
+    base_year = int(year.min())
+    n_strata = (int(year.max()) - base_year + 1) * 2
+    
+    if njit is not None:
+        return _build_strata_kernel(year, target, base_year, n_strata)
+    
+    strata = (year.astype(np.int64) - base_year) * 2 + target
+    return strata, np.bincount(strata, minlength=n_strata)
 
 
 def create_stratified_sample(df: pd.DataFrame, target_size: int = 600000, 
-                           random_state: int = 42) -> pd.DataFrame:
+                           random_state: int = 42) -> Tuple[pd.DataFrame, Dict[str, pd.Series]]:
     """
     Cria amostra estratificada por ano e target, mantendo representatividade.
     
     Args:
-        df: DataFrame filtrado
+        df: DataFrame filtrado (com colunas 'ano' e 'target_default')
         target_size: Tamanho desejado da amostra
         random_state: Seed para reprodutibilidade
         
     Returns:
-        DataFrame com amostra estratificada
+        Tupla com (DataFrame com amostra estratificada, distribuições por ano
+        'original_year_dist' e 'sample_year_dist')
     """
     print(f"Criando amostra estratificada de {target_size:,} registros...")
     
-    # Criar estratos por ano e target
-    df['ano'] = df['issue_d'].dt.year
-    df['strata'] = df['ano'].astype(str) + '_' + df['target_default'].astype(str)
+    # Gerador único (PCG64) compartilhado por todos os estratos
+    rng = np.random.default_rng(random_state)
     
-    # Calcular proporções originais
-    strata_counts = df['strata'].value_counts()
+    # Criar estratos inteiros por ano e target e calcular proporções originais
+    strata, all_strata_counts = _build_strata(df['ano'].to_numpy(), df['target_default'].to_numpy())
+    strata_ids = np.flatnonzero(all_strata_counts)
+    strata_counts = all_strata_counts[strata_ids]
     strata_props = strata_counts / len(df)
     
-    print(f"   Estratos identificados: {len(strata_counts)}")
-    
-    # Calcular tamanho de cada estrato na amostra
-    sample_sizes = {}
-    for strata, prop in strata_props.items():
-        sample_size = int(target_size * prop)
-        if sample_size == 0 and strata_counts[strata] > 0:
-            sample_size = 1  # Garantir pelo menos 1 por estrato
-        sample_sizes[strata] = min(sample_size, strata_counts[strata])
-    
-    # Amostragem estratificada
-    dfs_sample = []
-    for strata, sample_size in sample_sizes.items():
-        if sample_size > 0:
-            strata_data = df[df['strata'] == strata]
-            if len(strata_data) >= sample_size:
-                sampled = strata_data.sample(n=sample_size, random_state=random_state)
-            else:
-                sampled = strata_data
-            dfs_sample.append(sampled)
-    
-    # Combinar amostras
-    df_sample = pd.concat(dfs_sample, ignore_index=True)
-    
-    # Limpar colunas auxiliares
-    df_sample = df_sample.drop(['strata'], axis=1)
-    
-    # Verificar representatividade
-    original_year_dist = df['ano'].value_counts(normalize=True).sort_index()
-    sample_year_dist = df_sample['ano'].value_counts(normalize=True).sort_index()
+    print(f"   Estratos identificados: {len(strata_ids)}")
+    
+    # Calcular tamanho de cada estrato na amostra (pelo menos 1 por estrato)
+    sample_sizes = np.maximum(np.floor(strata_props * target_size).astype(np.int64), 1)
+    sample_sizes = np.minimum(sample_sizes, strata_counts)
+    
+    # Amostragem estratificada: um único agrupamento das posições de linha e,
+    # por estrato, sorteio sem reposição e sem embaralhar (O(k) em vez de O(n))
+    # (estratos categóricos: o agrupamento usa os códigos diretamente, sem hashing)
+    strata = pd.Categorical.from_codes(strata, categories=np.arange(len(all_strata_counts)))
+    strata_rows = pd.Series(np.arange(len(strata))).groupby(strata, observed=True).indices
+    chosen = []
+    for sid, sample_size in zip(strata_ids, sample_sizes):
+        rows = strata_rows[sid]
+        chosen.append(rows[rng.choice(len(rows), size=sample_size, replace=False, shuffle=False)])
+    
+    # Combinar amostras com uma única seleção de linhas
+    df_sample = df.take(np.concatenate(chosen)).reset_index(drop=True)
+    
+    # Verificar representatividade (distribuições por ano a partir das contagens por estrato)
+    strata_years = pd.Index(df['ano'].min() + strata_ids // 2, name='ano')
+    original_year_dist = pd.Series(strata_counts, index=strata_years).groupby(level=0).sum() / len(df)
+    sample_year_dist = pd.Series(sample_sizes, index=strata_years).groupby(level=0).sum() / len(df_sample)
     max_diff = abs(original_year_dist - sample_year_dist).max()
     
     print(f"Amostra criada: {len(df_sample):,} registros")
     print(f"   Máxima diferença temporal: {max_diff:.1%}")
     
-    return df_sample
+    year_dists = {
+        'original_year_dist': original_year_dist,
+        'sample_year_dist': sample_year_dist
+    }
+    
+    return df_sample, year_dists
 
 
-def save_sample_for_github(df: pd.DataFrame, filename: str = 'lending_club_sample_2015_2020.csv.gz') -> Dict[str, float]:
+def write_csv_gzip(df: pd.DataFrame, filename: str) -> None:
+    """
+    Salva DataFrame em CSV comprimido com gzip (formato legado).
+    
+    Args:
+        df: DataFrame a salvar
+        filename: Caminho do arquivo .csv.gz
+    """
+    df.to_csv(filename, index=False, compression='gzip')
+
+
+def write_csv_zstd(df: pd.DataFrame, filename: str) -> None:
+    """
+    Salva DataFrame em CSV comprimido com Zstd multithread em modo long-range.
+    
+    A janela longa (2^27) captura padrões repetidos ao longo de milhões de
+    linhas (UFs, grades) e a compressão usa todos os núcleos.
+    
+    Args:
+        df: DataFrame a salvar
+        filename: Caminho do arquivo .csv.zst
+        
+    Raises:
+        ImportError: Se zstandard não estiver instalado
+    """
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("Biblioteca 'zstandard' não encontrada. Instale com: uv add zstandard")
+    
+    params = zstandard.ZstdCompressionParameters.from_level(9, enable_ldm=True, window_log=27, threads=-1)
+    df.to_csv(filename, index=False, compression={'method': 'zstd', 'compression_params': params})
+
+
+def write_parquet_zstd(df: pd.DataFrame, filename: str) -> None:
+    """
+    Salva DataFrame em Parquet comprimido com Zstd.
+    
+    Colunas de baixa cardinalidade são convertidas para categóricas antes da
+    conversão, para que o Parquet as grave com dictionary encoding. Colunas
+    float usam byte stream split quando o dicionário não compensa.
+    
+    Args:
+        df: DataFrame a salvar
+        filename: Caminho do arquivo .parquet
+    """
+    categorical_cols = {col: df[col].astype('category')
+                        for col in LOW_CARDINALITY_COLS if col in df.columns}
+    table = pa.Table.from_pandas(df.assign(**categorical_cols), preserve_index=False)
+    float_cols = [field.name for field in table.schema if pa.types.is_floating(field.type)]
+    pq.write_table(table, filename, compression='zstd', compression_level=9,
+                   use_dictionary=True, use_byte_stream_split=float_cols,
+                   data_page_size=1 << 20, write_batch_size=65536)
+
+
+def save_sample_for_github(df: pd.DataFrame, filename: str = 'lending_club_sample_2015_2020.parquet') -> Dict[str, float]:
     """
     Salva amostra comprimida para upload no GitHub.
     
+    O formato é definido pela extensão: Parquet+Zstd por padrão, CSV+Zstd
+    quando o arquivo termina em .csv.zst, ou CSV+gzip (formato legado)
+    quando termina em .csv.gz.
+    
     Args:
         df: DataFrame da amostra
         filename: Nome do arquivo a salvar
@@ -208,7 +870,12 @@ def save_sample_for_github(df: pd.DataFrame, filename: str = 'lending_club_sampl
     """
     print(f"Salvando amostra: {filename}")
     
-    df.to_csv(filename, index=False, compression='gzip')
+    if filename.endswith('.csv.gz'):
+        write_csv_gzip(df, filename)
+    elif filename.endswith('.csv.zst'):
+        write_csv_zstd(df, filename)
+    else:
+        write_parquet_zstd(df, filename)
     
     file_size_mb = os.path.getsize(filename) / (1024**2)
     is_github_suitable = file_size_mb <= 100
@@ -225,23 +892,17 @@ def save_sample_for_github(df: pd.DataFrame, filename: str = 'lending_club_sampl
     return info
 
 
-def analyze_temporal_distribution(df_original: pd.DataFrame, df_sample: pd.DataFrame) -> pd.DataFrame:
+def analyze_temporal_distribution(original_dist: pd.Series, sample_dist: pd.Series) -> pd.DataFrame:
     """
-    Analisa e compara distribuição temporal entre dataset original e amostra.
+    Compara distribuição temporal entre dataset original e amostra.
     
     Args:
-        df_original: DataFrame original filtrado
-        df_sample: DataFrame da amostra
+        original_dist: Proporção de registros por ano no dataset original filtrado
+        sample_dist: Proporção de registros por ano na amostra
         
     Returns:
         DataFrame com comparação das distribuições
     """
-    df_original['ano'] = df_original['issue_d'].dt.year
-    df_sample['ano'] = df_sample['issue_d'].dt.year
-    
-    original_dist = df_original['ano'].value_counts(normalize=True).sort_index()
-    sample_dist = df_sample['ano'].value_counts(normalize=True).sort_index()
-    
     comparison = pd.DataFrame({
         'Original (%)': (original_dist * 100).round(1),
         'Amostra (%)': (sample_dist * 100).round(1),
@@ -252,13 +913,17 @@ def analyze_temporal_distribution(df_original: pd.DataFrame, df_sample: pd.DataF
 
 
 def process_lending_club_pipeline(dataset_id: str = 'ethon0426/lending-club-20072020q1',
-                                target_sample_size: int = 600000) -> Tuple[pd.DataFrame, Dict]:
+                                target_sample_size: int = 600000,
+                                use_polars: bool = True,
+                                use_checkpoint: bool = True) -> Tuple[pd.DataFrame, Dict]:
     """
     Pipeline completo de processamento dos dados do Lending Club.
     
     Args:
         dataset_id: ID do dataset no Kaggle
         target_sample_size: Tamanho da amostra final
+        use_polars: Carrega e filtra com Polars (multithread) quando instalado
+        use_checkpoint: Reaproveita os dados filtrados salvos em execução anterior
         
     Returns:
         Tupla com (DataFrame da amostra, informações do processo)
@@ -267,23 +932,38 @@ def process_lending_club_pipeline(dataset_id: str = 'ethon0426/lending-club-2007
         # 1. Download
         main_file = download_kaggle_dataset(dataset_id)
         
-        # 2. Carregamento
-        df = load_lending_club_data(main_file)
+        # 2. Carregamento (apenas anos 2015-2020 e colunas mantidas após anonimização)
+        cache_dir = _materialize_parquet_cache(main_file)
+        
+        if use_polars and pl is None:
+            print("Biblioteca 'polars' não encontrada; usando pandas")
+            use_polars = False
+        
+        checkpoint = _load_checkpoint('filtered', main_file) if use_checkpoint else None
+        if checkpoint is not None:
+            original_shape, df_filtered = checkpoint
+        elif use_polars:
+            # 2-3. Carregamento, anonimização e filtragem em uma única consulta lazy
+            original_shape, df_filtered = anonymize_and_filter_data_polars(cache_dir)
+        else:
+            # 2-3. Carregamento, anonimização e filtragem em blocos
+            original_shape, df_filtered = anonymize_and_filter_data_chunked(cache_dir)
         
-        # 3. Anonimização e filtragem
-        df_filtered = anonymize_and_filter_data(df)
+        if use_checkpoint and checkpoint is None:
+            _checkpoint(df_filtered, 'filtered', main_file, original_shape)
         
         # 4. Amostragem estratificada
-        df_sample = create_stratified_sample(df_filtered, target_sample_size)
+        df_sample, year_dists = create_stratified_sample(df_filtered, target_sample_size)
         
         # 5. Salvamento
         file_info = save_sample_for_github(df_sample)
         
         # 6. Análise temporal
-        temporal_analysis = analyze_temporal_distribution(df_filtered, df_sample)
+        temporal_analysis = analyze_temporal_distribution(year_dists['original_year_dist'],
+                                                          year_dists['sample_year_dist'])
         
         process_info = {
-            'original_shape': df.shape,
+            'original_shape': original_shape,
             'filtered_shape': df_filtered.shape,
             'sample_shape': df_sample.shape,
             'file_info': file_info,